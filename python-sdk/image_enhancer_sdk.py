@@ -5,23 +5,247 @@ Provides programmatic access to the image enhancement API with debugging and bat
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import aiohttp
+import asyncio
+import concurrent.futures
+import collections
+import contextlib
+import io
 import json
 import base64
-import time
+import mmap
 import os
+import threading
+import time
 import argparse
-from typing import Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 from pathlib import Path
 import logging
 
+# Install pillow-simd in place of Pillow for AVX2-accelerated resizing
+from PIL import Image, ImageOps
+
+try:
+    # Optional HTTP/2 transport (pip install 'httpx[http2]')
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    # SIMD-accelerated base64 (AVX2/AVX-512); falls back to the stdlib codec
+    import pybase64
+except ImportError:
+    pybase64 = None
+
+try:
+    # Token-bucket rate limiting for batch fan-out
+    from aiolimiter import AsyncLimiter
+except ImportError:
+    AsyncLimiter = None
+
+try:
+    # Streams multipart uploads instead of building the whole body in memory
+    from requests_toolbelt.multipart.encoder import MultipartEncoder
+except ImportError:
+    MultipartEncoder = None
+
+try:
+    # Fast C JSON serializer for multi-MB data URI payloads
+    import orjson
+except ImportError:
+    orjson = None
+
+_JSON_HEADERS = {'Content-Type': 'application/json'}
+# Gateway errors worth retrying, and the exponential backoff between attempts
+_RETRY_STATUSES = (502, 503, 504)
+_RETRY_BACKOFF = 0.3
+
+# Responses kept for conditional (If-None-Match) requests
+_ETAG_CACHE_SIZE = 128
+
+_DOWNLOAD_CHUNK_SIZE = 64 * 1024
+# Characters of base64 text decoded per write when saving data URI results
+_B64_DECODE_SLICE = 1024 * 1024
+
+# Content types by file extension; cheaper than mimetypes.guess_type per image
+_MIME_BY_EXT = {
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.png': 'image/png',
+    '.webp': 'image/webp',
+    '.bmp': 'image/bmp'
+}
+# Tuple form for str.endswith when scanning input directories
+_IMAGE_EXTENSIONS = tuple(_MIME_BY_EXT)
+
+
+def _mime_type(image_path: str) -> str:
+    """Return the content type for an image path based on its extension"""
+    return _MIME_BY_EXT.get(Path(image_path).suffix.lower(), 'application/octet-stream')
+
+
+def _json_dumps(payload: Any) -> bytes:
+    """Serialize a request payload to JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, separators=(',', ':')).encode('utf-8')
+
+
+def _b64encode(data: Union[bytes, mmap.mmap]) -> str:
+    """Base64-encode a bytes-like buffer to an ASCII string"""
+    if pybase64 is not None:
+        return pybase64.b64encode_as_string(data)
+    return base64.b64encode(data).decode('ascii')
+
+
+def _b64decode(data: Union[str, bytes]) -> bytes:
+    """Decode a base64 string to bytes"""
+    if pybase64 is not None:
+        return pybase64.b64decode(data, validate=False)
+    return base64.b64decode(data)
+
+
+class _RateLimiter:
+    """Leaky-bucket limiter that spaces request starts 1/rate seconds apart"""
+    
+    def __init__(self, rate: Optional[float]):
+        self._interval = 1.0 / rate if rate else 0.0
+        self._next_slot = time.monotonic()
+    
+    async def __aenter__(self) -> None:
+        if not self._interval:
+            return
+        now = time.monotonic()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + self._interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+    
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        pass
+
+
+def _check_rps(rps: Optional[float]) -> None:
+    """Reject rate limits that cannot admit any requests"""
+    if rps is not None and rps <= 0:
+        raise ValueError(f"rps must be positive or None for no limit, got {rps!r}")
+
+
+def _check_count(name: str, value: int) -> None:
+    """Reject concurrency and chunk sizes that would never let a request through"""
+    if value < 1:
+        raise ValueError(f"{name} must be at least 1, got {value!r}")
+
+
+def _make_rate_limiter(rps: Optional[float]):
+    """Create an async context manager that admits at most rps requests per second"""
+    _check_rps(rps)
+    if rps and AsyncLimiter is not None:
+        # AsyncLimiter needs a bucket of at least one token, so slow rates
+        # hand out one token per 1/rps seconds instead
+        return AsyncLimiter(max(rps, 1), max(1, 1 / rps))
+    return _RateLimiter(rps)
+
+
 class ImageEnhancerSDK:
     """Python SDK for the Advanced Image Enhancement API"""
     
-    def __init__(self, base_url: str = "http://localhost:8000", admin_key: Optional[str] = None):
+    WIRE_FORMATS = ('json', 'multipart')
+    
+    def __init__(self, base_url: str = "http://localhost:8000", admin_key: Optional[str] = None,
+                 wire_format: str = 'json', pool_size: int = 32, max_retries: int = 3,
+                 http2: bool = False):
+        if wire_format not in self.WIRE_FORMATS:
+            raise ValueError(f"wire_format must be one of {self.WIRE_FORMATS}, got {wire_format!r}")
+        if http2 and httpx is None:
+            raise ImportError("http2=True requires httpx: pip install 'httpx[http2]'")
+        
         self.base_url = base_url.rstrip('/')
         self.admin_key = admin_key or os.getenv('ADMIN_KEY', 'dev-admin-key')
-        self.session = requests.Session()
+        # 'json' sends images as base64 data URIs; 'multipart' uploads the raw file bytes
+        self.wire_format = wire_format
+        self.http2 = http2
+        self.pool_size = pool_size
+        # Attempts after the first for 502/503/504 and dropped connections, on the sync
+        # session and on batch fan-out alike; with http2=True, sync calls only retry
+        # failed connections because httpx does not retry error responses
+        self.max_retries = max_retries
+        # Streamed multipart bodies can only be read once, so they go through a
+        # session without adapter retries and are retried with a fresh encoder
+        self._stream_session = None
+        if http2:
+            self.session = self._setup_http2_client(pool_size, max_retries)
+        else:
+            self.session = self._setup_session(pool_size, max_retries)
+            if wire_format == 'multipart' and MultipartEncoder is not None:
+                self._stream_session = self._setup_session(pool_size, 0)
         self.logger = self._setup_logger()
+        # Request key -> (ETag, parsed body), most recently used last
+        self._etag_cache: 'collections.OrderedDict[Any, Tuple[str, Dict]]' = collections.OrderedDict()
+        self._etag_lock = threading.Lock()
+        # Worker threads for the *_async wrappers around blocking calls
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=16)
+    
+    @property
+    def admin_key(self) -> str:
+        return self._admin_key
+    
+    @admin_key.setter
+    def admin_key(self, value: str) -> None:
+        self._admin_key = value
+        # Serialized tail of every admin request body, rebuilt only when the key changes
+        self._admin_key_suffix = b',"adminKey":' + _json_dumps(value) + b'}'
+    
+    def __enter__(self) -> 'ImageEnhancerSDK':
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+    
+    def close(self) -> None:
+        """Shut down the worker threads and close the HTTP session"""
+        self._executor.shutdown(wait=True)
+        self.session.close()
+        if self._stream_session is not None:
+            self._stream_session.close()
+    
+    def _setup_session(self, pool_size: int, max_retries: int) -> requests.Session:
+        """Setup a keep-alive HTTP session with a sized connection pool and retries"""
+        session = requests.Session()
+        
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=_RETRY_BACKOFF,
+            status_forcelist=_RETRY_STATUSES,
+            allowed_methods=frozenset(['POST', 'GET']),
+            # Hand the last error response back so callers still see the server's message
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        session.headers.update({
+            'User-Agent': 'ImageEnhancerSDK/1.0',
+            'Connection': 'keep-alive'
+        })
+        
+        return session
+    
+    def _setup_http2_client(self, pool_size: int, max_retries: int) -> 'httpx.Client':
+        """Setup an httpx client that multiplexes requests over HTTP/2"""
+        limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        # httpx only retries failed connection attempts, not error responses
+        transport = httpx.HTTPTransport(http2=True, limits=limits, retries=max_retries)
+        
+        return httpx.Client(
+            base_url=self.base_url,
+            transport=transport,
+            timeout=300,
+            follow_redirects=True,
+            headers={'User-Agent': 'ImageEnhancerSDK/1.0'}
+        )
         
     def _setup_logger(self) -> logging.Logger:
         """Setup logging for the SDK"""
@@ -39,7 +263,7 @@ class ImageEnhancerSDK:
         return logger
     
     def enhance_image(self, image_path: str, model: str = 'nightmareai/real-esrgan', 
-                     options: Optional[Dict] = None) -> Dict:
+                     options: Optional[Dict] = None, max_input_dim: Optional[int] = None) -> Dict:
         """
         Enhance a single image
         
@@ -47,27 +271,20 @@ class ImageEnhancerSDK:
             image_path: Path to the image file
             model: AI model to use for enhancement
             options: Additional processing options
+            max_input_dim: Downscale images whose longest side exceeds this
+                many pixels before uploading
             
         Returns:
             Dictionary containing enhancement results
         """
         try:
-            # Read and encode image
-            with open(image_path, 'rb') as f:
-                image_data = base64.b64encode(f.read()).decode('utf-8')
-                image_data_url = f"data:image/jpeg;base64,{image_data}"
-            
-            payload = {
-                'image': image_data_url,
-                'model': model,
-                'options': options or {}
-            }
-            
-            self.logger.info(f"Enhancing image: {image_path}")
-            response = self.session.post(
-                f"{self.base_url}/api/enhance",
-                json=payload,
-                timeout=300  # 5 minutes timeout
+            self.logger.info("Enhancing image: %s", image_path)
+            response = self._post_image(
+                '/api/enhance',
+                image_path,
+                {'model': model, 'options': options or {}},
+                timeout=300,  # 5 minutes timeout
+                max_input_dim=max_input_dim
             )
             
             if response.status_code == 200:
@@ -85,38 +302,559 @@ class ImageEnhancerSDK:
             return {'error': error_msg}
     
     def batch_enhance(self, image_paths: List[str], model: str = 'nightmareai/real-esrgan',
-                     options: Optional[Dict] = None, max_concurrent: int = 3) -> List[Dict]:
+                     options: Optional[Dict] = None, max_concurrent: int = 3,
+                     max_input_dim: Optional[int] = None,
+                     output_paths: Optional[List[str]] = None,
+                     rps: Optional[float] = 5.0) -> List[Dict]:
         """
         Enhance multiple images in batch
         
+        Requests are issued concurrently on a single aiohttp session (or an
+        HTTP/2 httpx.AsyncClient when http2=True), with at most max_concurrent
+        in flight at once. Must not be called from inside a running event loop.
+        
         Args:
             image_paths: List of image file paths
             model: AI model to use for enhancement
             options: Additional processing options
             max_concurrent: Maximum concurrent requests
+            max_input_dim: Downscale images whose longest side exceeds this
+                many pixels before uploading
+            output_paths: Save destinations aligned with image_paths, copied
+                into each result as 'output_path'
+            rps: Maximum requests started per second (None for no limit)
             
         Returns:
             List of enhancement results
         """
-        results = []
+        if output_paths is not None and len(output_paths) != len(image_paths):
+            raise ValueError("output_paths must be the same length as image_paths")
+        _check_count('max_concurrent', max_concurrent)
+        _check_rps(rps)
         
-        self.logger.info(f"Starting batch enhancement of {len(image_paths)} images")
+        self.logger.info("Starting batch enhancement of %d images", len(image_paths))
+        results = asyncio.run(
+            self._batch_async(image_paths, model, options, max_concurrent, max_input_dim, rps)
+        )
+        self._attach_output_paths(results, output_paths)
+        self.logger.info("Batch enhancement completed")
+        return results
+    
+    async def _batch_async(self, image_paths: List[str], model: str, options: Optional[Dict],
+                           max_concurrent: int, max_input_dim: Optional[int] = None,
+                           rps: Optional[float] = None) -> List[Dict]:
+        """Fan out enhancement requests with at most max_concurrent in flight"""
+        sem = asyncio.Semaphore(max_concurrent)
+        limiter = _make_rate_limiter(rps)
+        # Payloads are encoded ahead of the senders, but only this many at once to bound memory
+        prefetch = asyncio.Semaphore(max_concurrent * 2)
+        
+        async with self._async_client(max_concurrent) as session:
+            tasks = [
+                self._enhance_async(session, sem, prefetch, limiter, i, len(image_paths),
+                                    image_path, model, options, max_input_dim)
+                for i, image_path in enumerate(image_paths)
+            ]
+            outcomes = await asyncio.gather(*tasks, return_exceptions=True)
         
-        for i, image_path in enumerate(image_paths):
-            self.logger.info(f"Processing image {i+1}/{len(image_paths)}: {image_path}")
-            result = self.enhance_image(image_path, model, options)
+        results = []
+        for image_path, outcome in zip(image_paths, outcomes):
+            if isinstance(outcome, BaseException):
+                error_msg = f"Error enhancing image: {str(outcome)}"
+                self.logger.error(error_msg)
+                outcome = {'error': error_msg}
             results.append({
                 'image_path': image_path,
-                'result': result
+                'result': outcome
             })
+        return results
+    
+    def _async_client(self, max_concurrent: int):
+        """Create the async HTTP client used for batch fan-out"""
+        if self.http2:
+            limits = httpx.Limits(max_connections=max_concurrent,
+                                  max_keepalive_connections=max_concurrent)
+            return httpx.AsyncClient(http2=True, limits=limits, timeout=300, follow_redirects=True,
+                                     headers={'User-Agent': 'ImageEnhancerSDK/1.0'})
+        
+        connector = aiohttp.TCPConnector(limit=max_concurrent, keepalive_timeout=60)
+        timeout = aiohttp.ClientTimeout(total=300)
+        return aiohttp.ClientSession(connector=connector, timeout=timeout,
+                                     headers={'User-Agent': 'ImageEnhancerSDK/1.0'})
+    
+    async def _enhance_async(self, session, sem: asyncio.Semaphore, prefetch: asyncio.Semaphore,
+                             limiter, index: int, total: int, image_path: str, model: str,
+                             options: Optional[Dict], max_input_dim: Optional[int] = None) -> Dict:
+        """Enhance a single image on a shared async client"""
+        url = f"{self.base_url}/api/enhance"
+        
+        async with prefetch:
+            # Encode or downscale on a worker thread so it overlaps with requests already in flight
+            loop = asyncio.get_running_loop()
+            request = await loop.run_in_executor(self._executor, self._prepare_enhance_request,
+                                                 image_path, model, options, max_input_dim)
+            async with limiter, sem:
+                self._log_progress(index, total, image_path)
+                if 'image_file' in request and request['image_file'] is None:
+                    # Nothing was resized, so stream the original file
+                    with self._open_image_upload(image_path) as image_file:
+                        return await self._post_async(session, url, image_file=image_file,
+                                                      fields=request['fields'])
+                return await self._post_async(session, url, **request)
+    
+    def _log_progress(self, index: int, total: int, image_path: str) -> None:
+        """Log batch progress every 10th image, or for every image at DEBUG level"""
+        if index % 10 == 0 or self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.info("Processing image %d/%d: %s", index + 1, total, image_path)
+    
+    async def _post_async(self, session, url: str, data: Optional[bytes] = None,
+                          image_file: Optional[tuple] = None,
+                          fields: Optional[Dict] = None) -> Dict:
+        """POST a JSON body or a multipart upload and return the result dictionary"""
+        status, body = await self._request_async(session, url, data, image_file, fields)
+        if status == 200:
+            return body
+        
+        error_msg = f"Enhancement failed: {status} - {body}"
+        self.logger.error(error_msg)
+        return {'error': error_msg}
+    
+    async def _request_async(self, session, url: str, data: Optional[bytes] = None,
+                             image_file: Optional[tuple] = None,
+                             fields: Optional[Dict] = None) -> Tuple[int, Union[Dict, str]]:
+        """
+        POST on an aiohttp or httpx client, retrying gateway errors and dropped connections
+        
+        Neither async client has a retry policy of its own, so this applies the
+        sync session's max_retries and backoff, rewinding any upload between attempts.
+        
+        Returns:
+            (status, parsed JSON on success or error text otherwise)
+        """
+        retryable = (aiohttp.ClientConnectionError,) + ((httpx.NetworkError,) if httpx else ())
+        
+        for attempt in range(self.max_retries + 1):
+            if image_file is not None:
+                image_file[1].seek(0)
+            try:
+                status, body = await self._send_async(session, url, data, image_file, fields)
+            except retryable:
+                if attempt == self.max_retries:
+                    raise
+            else:
+                if status not in _RETRY_STATUSES or attempt == self.max_retries:
+                    return status, body
             
-            # Add small delay to avoid overwhelming the server
-            if i < len(image_paths) - 1:
-                time.sleep(1)
+            self.logger.debug("Retrying %s (attempt %d)", url, attempt + 2)
+            await asyncio.sleep(_RETRY_BACKOFF * 2 ** attempt)
+    
+    async def _send_async(self, session, url: str, data: Optional[bytes] = None,
+                          image_file: Optional[tuple] = None,
+                          fields: Optional[Dict] = None) -> Tuple[int, Union[Dict, str]]:
+        """
+        Make a single POST on an aiohttp or httpx client
         
+        Args:
+            data: Serialized JSON body, or None when sending image_file
+            image_file: (filename, file object, content type) for a multipart upload
+            fields: Extra multipart form fields
+            
+        Returns:
+            (status, parsed JSON on success or error text otherwise)
+        """
+        if self.http2:
+            if image_file is not None:
+                response = await session.post(url, files={'image': image_file}, data=fields)
+            else:
+                response = await session.post(url, content=data, headers=_JSON_HEADERS)
+            if response.status_code == 200:
+                return response.status_code, response.json()
+            return response.status_code, response.text
+        
+        if image_file is not None:
+            filename, fileobj, content_type = image_file
+            # aiohttp closes file payloads once sent, so hand it a separate handle and keep
+            # ours open for retries
+            payload = fileobj.getvalue() if isinstance(fileobj, io.BytesIO) else open(fileobj.name, 'rb')
+            form = aiohttp.FormData()
+            form.add_field('image', payload, filename=filename, content_type=content_type)
+            for key, value in fields.items():
+                form.add_field(key, value)
+            request = session.post(url, data=form)
+        else:
+            request = session.post(url, data=data, headers=_JSON_HEADERS)
+        async with request as response:
+            if response.status == 200:
+                return response.status, await response.json()
+            return response.status, await response.text()
+    
+    def batch_enhance_batched(self, image_paths: List[str], model: str = 'nightmareai/real-esrgan',
+                              options: Optional[Dict] = None, chunk_size: int = 8,
+                              max_concurrent: int = 3,
+                              output_paths: Optional[List[str]] = None,
+                              rps: Optional[float] = 5.0,
+                              max_input_dim: Optional[int] = None) -> List[Dict]:
+        """
+        Enhance multiple images, sending chunk_size images per request
+        
+        Chunks are POSTed to the server's /api/batch/enhance endpoint as base64
+        JSON (regardless of wire_format), with up to max_concurrent chunks in
+        flight. If the server does not expose the batch endpoint (404), the
+        affected images fall back to per-image batch_enhance.
+        
+        Args:
+            image_paths: List of image file paths
+            model: AI model to use for enhancement
+            options: Additional processing options
+            chunk_size: Number of images per batch request
+            max_concurrent: Maximum concurrent batch requests
+            output_paths: Save destinations aligned with image_paths, copied
+                into each result as 'output_path'
+            rps: Maximum batch requests started per second (None for no limit)
+            max_input_dim: Downscale images whose longest side exceeds this
+                many pixels before uploading
+            
+        Returns:
+            List of enhancement results, aligned with image_paths
+        """
+        if output_paths is not None and len(output_paths) != len(image_paths):
+            raise ValueError("output_paths must be the same length as image_paths")
+        _check_count('chunk_size', chunk_size)
+        _check_count('max_concurrent', max_concurrent)
+        _check_rps(rps)
+        
+        chunks = [image_paths[i:i + chunk_size] for i in range(0, len(image_paths), chunk_size)]
+        
+        self.logger.info("Starting batch enhancement of %d images in %d chunks",
+                         len(image_paths), len(chunks))
+        chunk_results = asyncio.run(
+            self._batch_chunks_async(chunks, model, options, max_concurrent, rps, max_input_dim)
+        )
+        
+        # Chunks that hit (or were skipped after) a 404 go through one per-image batch together
+        fallback_paths = [path for chunk, chunk_result in zip(chunks, chunk_results)
+                          if chunk_result is None for path in chunk]
+        fallback_results = iter([])
+        if fallback_paths:
+            self.logger.warning("Batch endpoint not available, falling back to per-image requests")
+            fallback_results = iter(
+                self.batch_enhance(fallback_paths, model, options, max_concurrent,
+                                   max_input_dim=max_input_dim, rps=rps)
+            )
+        
+        results = []
+        for chunk, chunk_result in zip(chunks, chunk_results):
+            if chunk_result is None:
+                chunk_result = [next(fallback_results) for _ in chunk]
+            results.extend(chunk_result)
+        
+        self._attach_output_paths(results, output_paths)
         self.logger.info("Batch enhancement completed")
         return results
     
+    @staticmethod
+    def _attach_output_paths(results: List[Dict], output_paths: Optional[List[str]]) -> None:
+        """Record each image's save destination on its batch result"""
+        if output_paths is None:
+            return
+        for item, output_path in zip(results, output_paths):
+            item['output_path'] = output_path
+    
+    async def _batch_chunks_async(self, chunks: List[List[str]], model: str,
+                                  options: Optional[Dict], max_concurrent: int,
+                                  rps: Optional[float] = None,
+                                  max_input_dim: Optional[int] = None) -> List[Optional[List[Dict]]]:
+        """Send image chunks to the batch endpoint with at most max_concurrent in flight"""
+        sem = asyncio.Semaphore(max_concurrent)
+        prefetch = asyncio.Semaphore(max_concurrent * 2)
+        limiter = _make_rate_limiter(rps)
+        # Set on the first 404 so the remaining chunks are not encoded or sent
+        unavailable = asyncio.Event()
+        
+        async with self._async_client(max_concurrent) as session:
+            tasks = [self._enhance_chunk_async(session, sem, prefetch, limiter, unavailable,
+                                               chunk, model, options, max_input_dim)
+                     for chunk in chunks]
+            outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+        
+        results = []
+        for chunk, outcome in zip(chunks, outcomes):
+            if isinstance(outcome, BaseException):
+                error_msg = f"Error enhancing batch: {str(outcome)}"
+                self.logger.error(error_msg)
+                outcome = [{'image_path': path, 'result': {'error': error_msg}} for path in chunk]
+            results.append(outcome)
+        return results
+    
+    async def _enhance_chunk_async(self, session, sem: asyncio.Semaphore,
+                                   prefetch: asyncio.Semaphore, limiter,
+                                   unavailable: asyncio.Event, chunk: List[str], model: str,
+                                   options: Optional[Dict],
+                                   max_input_dim: Optional[int] = None) -> Optional[List[Dict]]:
+        """
+        Enhance one chunk of images in a single request
+        
+        Returns None if the batch endpoint returned 404, or if another chunk
+        already found it missing.
+        """
+        async with prefetch:
+            if unavailable.is_set():
+                return None
+            loop = asyncio.get_running_loop()
+            data = await loop.run_in_executor(self._executor, self._build_chunk_body,
+                                              chunk, model, options, max_input_dim)
+            async with limiter, sem:
+                if unavailable.is_set():
+                    return None
+                status, body = await self._request_async(
+                    session, f"{self.base_url}/api/batch/enhance", data=data
+                )
+        
+        if status == 404:
+            unavailable.set()
+            return None
+        if status != 200:
+            error_msg = f"Batch enhancement failed: {status} - {body}"
+            self.logger.error(error_msg)
+            return [{'image_path': path, 'result': {'error': error_msg}} for path in chunk]
+        
+        # Items carry the id we sent, so match on it instead of trusting result order
+        items_by_id = {item.get('id'): item for item in body.get('results', [])}
+        results = []
+        for i, image_path in enumerate(chunk):
+            item = items_by_id.get(str(i))
+            if item is None:
+                result = {'error': 'No result returned for image'}
+            elif item.get('status') != 'completed':
+                result = {'error': item.get('error', 'Enhancement failed')}
+            else:
+                result = item
+            results.append({'image_path': image_path, 'result': result})
+        return results
+    
+    def _prepare_enhance_request(self, image_path: str, model: str, options: Optional[Dict],
+                                 max_input_dim: Optional[int] = None) -> Dict:
+        """
+        Do the CPU-bound preparation of one /api/enhance request
+        
+        Returns:
+            Keyword arguments for _post_async: the serialized JSON body, or for
+            multipart the downscaled upload (None to send the original file)
+            and the form fields
+        """
+        if self.wire_format == 'multipart':
+            return {
+                'image_file': self._resized_upload(image_path, max_input_dim),
+                'fields': {'model': model, 'options': json.dumps(options or {})}
+            }
+        return {'data': self._build_enhance_body(image_path, model, options, max_input_dim)}
+    
+    def _build_enhance_body(self, image_path: str, model: str, options: Optional[Dict],
+                            max_input_dim: Optional[int] = None) -> bytes:
+        """Read an image from disk and serialize the JSON /api/enhance request body"""
+        return _json_dumps({
+            'image': self._encode_image(image_path, max_input_dim),
+            'model': model,
+            'options': options or {}
+        })
+    
+    def _build_chunk_body(self, chunk: List[str], model: str, options: Optional[Dict],
+                          max_input_dim: Optional[int] = None) -> bytes:
+        """Read a chunk of images and serialize the JSON /api/batch/enhance request body"""
+        return _json_dumps({
+            'images': [
+                {
+                    'id': str(i),
+                    'image': self._encode_image(image_path, max_input_dim),
+                    'filename': os.path.basename(image_path)
+                }
+                for i, image_path in enumerate(chunk)
+            ],
+            'globalOptions': {**(options or {}), 'model': model}
+        })
+    
+    def _encode_image(self, image_path: str, max_input_dim: Optional[int] = None) -> str:
+        """Read an image from disk and return it as a base64 data URI"""
+        if max_input_dim:
+            resized = self._downscale_image(image_path, max_input_dim)
+            if resized is not None:
+                return f"data:image/jpeg;base64,{_b64encode(resized)}"
+        
+        with open(image_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                # mmap cannot map an empty file
+                image_data = ''
+            else:
+                # Encode straight from the page cache instead of copying into a bytes object
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    image_data = _b64encode(mm)
+        return f"data:{_mime_type(image_path)};base64,{image_data}"
+    
+    def _downscale_image(self, image_path: str, max_input_dim: int) -> Optional[bytes]:
+        """
+        Shrink an image so its longest side fits within max_input_dim
+        
+        Returns:
+            JPEG bytes of the resized image, or None if it already fits or
+            Pillow cannot decode it (the original bytes are uploaded instead)
+        """
+        try:
+            with Image.open(image_path) as img:
+                if max(img.size) <= max_input_dim:
+                    return None
+                
+                # Re-encoding drops EXIF, so bake the Orientation tag into the pixels first
+                img = ImageOps.exif_transpose(img)
+                img.thumbnail((max_input_dim, max_input_dim), Image.LANCZOS)
+                if img.mode not in ('RGB', 'L'):
+                    img = img.convert('RGB')
+                
+                buf = io.BytesIO()
+                img.save(buf, format='JPEG', quality=92)
+        except (OSError, ValueError, Image.DecompressionBombError) as e:
+            self.logger.warning("Could not downscale %s, uploading original: %s", image_path, e)
+            return None
+        
+        self.logger.debug("Downscaled %s to fit %dpx", image_path, max_input_dim)
+        return buf.getvalue()
+    
+    def _resized_upload(self, image_path: str, max_input_dim: Optional[int]) -> Optional[Tuple]:
+        """Return an upload tuple for a downscaled copy, or None to send the original file"""
+        resized = self._downscale_image(image_path, max_input_dim) if max_input_dim else None
+        if resized is None:
+            return None
+        return (os.path.basename(image_path), io.BytesIO(resized), 'image/jpeg')
+    
+    @contextlib.contextmanager
+    def _open_image_upload(self, image_path: str, max_input_dim: Optional[int] = None):
+        """Yield a (filename, file object, content type) tuple for a multipart upload"""
+        resized = self._resized_upload(image_path, max_input_dim)
+        if resized is not None:
+            yield resized
+            return
+        
+        with open(image_path, 'rb') as f:
+            yield (os.path.basename(image_path), f, _mime_type(image_path))
+    
+    def _post_image(self, endpoint: str, image_path: str, fields: Dict, timeout: int,
+                    max_input_dim: Optional[int] = None,
+                    headers: Optional[Dict] = None) -> requests.Response:
+        """POST an image and extra fields to an endpoint using the configured wire format"""
+        url = f"{self.base_url}{endpoint}"
+        
+        if self.wire_format == 'multipart':
+            with self._open_image_upload(image_path, max_input_dim) as image_file:
+                data = {key: json.dumps(value) if isinstance(value, dict) else value
+                        for key, value in fields.items()}
+                
+                if self._stream_session is not None:
+                    return self._post_multipart_stream(url, data, image_file, timeout, headers)
+                
+                # httpx streams file parts itself; plain requests buffers the encoded body
+                return self.session.post(url, files={'image': image_file}, data=data,
+                                         headers=headers, timeout=timeout)
+        
+        payload = {'image': self._encode_image(image_path, max_input_dim), **fields}
+        return self._post_json(url, payload, timeout=timeout, headers=headers)
+    
+    def _post_multipart_stream(self, url: str, data: Dict, image_file: Tuple, timeout: int,
+                               headers: Optional[Dict] = None) -> requests.Response:
+        """POST a streamed multipart body, rebuilding the one-shot encoder for each retry"""
+        filename, fileobj, mime = image_file
+        
+        for attempt in range(self.max_retries + 1):
+            fileobj.seek(0)
+            encoder = MultipartEncoder(fields={**data, 'image': (filename, fileobj, mime)})
+            request_headers = {**(headers or {}), 'Content-Type': encoder.content_type}
+            try:
+                response = self._stream_session.post(url, data=encoder, headers=request_headers,
+                                                     timeout=timeout)
+            except requests.ConnectionError:
+                if attempt == self.max_retries:
+                    raise
+            else:
+                if response.status_code not in _RETRY_STATUSES or attempt == self.max_retries:
+                    return response
+                response.close()
+            
+            self.logger.debug("Retrying multipart upload to %s (attempt %d)", url, attempt + 2)
+            time.sleep(_RETRY_BACKOFF * 2 ** attempt)
+    
+    def _post_json(self, url: str, payload: Union[Dict, bytes], timeout: int,
+                   headers: Optional[Dict] = None):
+        """POST a payload (or an already serialized JSON body) on the sync session"""
+        body = payload if isinstance(payload, bytes) else _json_dumps(payload)
+        headers = {**_JSON_HEADERS, **headers} if headers else _JSON_HEADERS
+        if self.http2:
+            return self.session.post(url, content=body, headers=headers, timeout=timeout)
+        return self.session.post(url, data=body, headers=headers, timeout=timeout)
+    
+    def _conditional_headers(self, key: Any) -> Optional[Dict]:
+        """
+        Return an If-None-Match header for a previously seen response
+        
+        Only responses that carried an ETag are cached, so servers that do not
+        emit ETags never receive conditional requests.
+        """
+        with self._etag_lock:
+            cached = self._etag_cache.get(key)
+            if cached is None:
+                return None
+            self._etag_cache.move_to_end(key)
+        return {'If-None-Match': cached[0]}
+    
+    def _send_conditional(self, key: Any, send) -> Tuple[Optional[Dict], Any]:
+        """
+        Send a request with If-None-Match when a cached ETag exists
+        
+        Args:
+            key: Cache key for the request
+            send: Callable taking extra headers (or None) and returning a response
+            
+        Returns:
+            (result from _read_conditional, final response)
+        """
+        headers = self._conditional_headers(key)
+        response = send(headers)
+        result = self._read_conditional(key, response, conditional=headers is not None)
+        
+        # A matched ETag whose entry was evicted meanwhile has nothing to
+        # serve, so fetch a fresh body once without the header
+        if result is None and headers is not None and response.status_code in (304, 412):
+            response = send(None)
+            result = self._read_conditional(key, response)
+        return result, response
+    
+    def _read_conditional(self, key: Any, response, conditional: bool = True) -> Optional[Dict]:
+        """
+        Resolve a response to a conditional request
+        
+        POSTs answer a matching If-None-Match with 412 rather than 304
+        (RFC 9110), so both mean the cached body is current. Any other status
+        drops the cached entry, so a stale ETag is never sent twice.
+        
+        Returns:
+            The cached body on 304 or 412, the parsed body on 200 (cached if
+            it carries an ETag), or None for any other status
+        """
+        with self._etag_lock:
+            if conditional and response.status_code in (304, 412):
+                cached = self._etag_cache.get(key)
+                return cached[1] if cached is not None else None
+            self._etag_cache.pop(key, None)
+        if response.status_code != 200:
+            return None
+        
+        result = response.json()
+        etag = response.headers.get('ETag')
+        if etag:
+            with self._etag_lock:
+                self._etag_cache[key] = (etag, result)
+                self._etag_cache.move_to_end(key)
+                if len(self._etag_cache) > _ETAG_CACHE_SIZE:
+                    self._etag_cache.popitem(last=False)
+        return result
+    
     def classify_image(self, image_path: str) -> Dict:
         """
         Classify image quality and get enhancement recommendations
@@ -128,20 +866,16 @@ class ImageEnhancerSDK:
             Dictionary containing classification results
         """
         try:
-            with open(image_path, 'rb') as f:
-                image_data = base64.b64encode(f.read()).decode('utf-8')
-                image_data_url = f"data:image/jpeg;base64,{image_data}"
-            
-            payload = {'image': image_data_url}
-            
-            response = self.session.post(
-                f"{self.base_url}/api/classify",
-                json=payload,
-                timeout=60
+            # Results are cached per file version, so edits to the image invalidate them
+            stat = os.stat(image_path)
+            key = ('classify', os.path.abspath(image_path), stat.st_mtime_ns, stat.st_size)
+            result, response = self._send_conditional(
+                key,
+                lambda headers: self._post_image('/api/classify', image_path, {}, timeout=60,
+                                                 headers=headers)
             )
-            
-            if response.status_code == 200:
-                return response.json()
+            if result is not None:
+                return result
             else:
                 return {'error': f"Classification failed: {response.status_code}"}
                 
@@ -150,7 +884,7 @@ class ImageEnhancerSDK:
     
     def get_system_status(self) -> Dict:
         """Get system status and health information"""
-        return self._admin_command('status')
+        return self._admin_command('status', cacheable=True)
     
     def get_health_check(self) -> Dict:
         """Perform health check on all services"""
@@ -162,7 +896,7 @@ class ImageEnhancerSDK:
     
     def get_metrics(self, time_range: str = '24h') -> Dict:
         """Get system metrics and performance data"""
-        return self._admin_command('metrics', {'timeRange': time_range})
+        return self._admin_command('metrics', {'timeRange': time_range}, cacheable=True)
     
     def test_apis(self) -> Dict:
         """Test connectivity to external APIs"""
@@ -190,25 +924,29 @@ class ImageEnhancerSDK:
         """Get detailed system information"""
         return self._admin_command('system-info')
     
-    def _admin_command(self, command: str, args: Optional[Dict] = None) -> Dict:
-        """Execute an admin command"""
+    def _admin_command(self, command: str, args: Optional[Dict] = None,
+                       cacheable: bool = False) -> Dict:
+        """Execute an admin command; read-only commands may pass cacheable=True"""
         try:
-            payload = {
-                'command': command,
-                'args': args or {},
-                'adminKey': self.admin_key
-            }
+            body = (b'{"command":' + _json_dumps(command) +
+                    b',"args":' + _json_dumps(args or {}) +
+                    self._admin_key_suffix)
             
-            response = self.session.post(
-                f"{self.base_url}/api/admin",
-                json=payload,
-                timeout=60
-            )
+            url = f"{self.base_url}/api/admin"
             
-            if response.status_code == 200:
-                return response.json()
+            if cacheable:
+                result, response = self._send_conditional(
+                    ('admin', body),
+                    lambda headers: self._post_json(url, body, timeout=60, headers=headers)
+                )
+                if result is not None:
+                    return result
             else:
-                return {'error': f"Admin command failed: {response.status_code} - {response.text}"}
+                response = self._post_json(url, body, timeout=60)
+                if response.status_code == 200:
+                    return response.json()
+            
+            return {'error': f"Admin command failed: {response.status_code} - {response.text}"}
                 
         except Exception as e:
             return {'error': f"Error executing admin command: {str(e)}"}
@@ -232,26 +970,98 @@ class ImageEnhancerSDK:
             enhanced_url = result['enhancedImage']
             
             if enhanced_url.startswith('data:'):
-                # Base64 encoded image
-                header, data = enhanced_url.split(',', 1)
-                image_data = base64.b64decode(data)
-            else:
-                # URL to download
-                response = self.session.get(enhanced_url)
-                if response.status_code != 200:
-                    self.logger.error(f"Failed to download enhanced image: {response.status_code}")
+                # Base64 encoded image; slice past the header rather than splitting
+                # the whole URI into two more multi-MB strings
+                comma = enhanced_url.find(',')
+                if comma < 0:
+                    self.logger.error("Malformed data URI in result")
                     return False
-                image_data = response.content
-            
-            with open(output_path, 'wb') as f:
-                f.write(image_data)
+                
+                with self._atomic_write(output_path) as f:
+                    self._write_base64(enhanced_url, comma + 1, f)
+            elif not self._download_to_file(enhanced_url, output_path):
+                return False
             
-            self.logger.info(f"Enhanced image saved to: {output_path}")
+            self.logger.info("Enhanced image saved to: %s", output_path)
             return True
             
         except Exception as e:
-            self.logger.error(f"Error saving enhanced image: {str(e)}")
+            self.logger.error("Error saving enhanced image: %s", e)
             return False
+    
+    @contextlib.contextmanager
+    def _atomic_write(self, output_path: str):
+        """
+        Open a temporary file next to output_path for writing
+        
+        The temporary file replaces output_path only if the block completes,
+        so a failed save never leaves a truncated image behind.
+        """
+        # Unique per process and thread; plain open() keeps the usual umask permissions
+        tmp_path = f"{output_path}.{os.getpid()}.{threading.get_ident()}.part"
+        try:
+            with open(tmp_path, 'wb') as f:
+                yield f
+            os.replace(tmp_path, output_path)
+        except BaseException:
+            # open() itself may have failed, leaving nothing to clean up
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(tmp_path)
+            raise
+    
+    @staticmethod
+    def _write_base64(data: str, start: int, f) -> None:
+        """Decode data[start:] as base64 into f one slice at a time"""
+        carry = ''
+        for offset in range(start, len(data), _B64_DECODE_SLICE):
+            # Drop line breaks and keep whole 4-character groups so each slice decodes alone
+            chunk = carry + ''.join(data[offset:offset + _B64_DECODE_SLICE].split())
+            whole = len(chunk) - len(chunk) % 4
+            f.write(_b64decode(chunk[:whole]))
+            carry = chunk[whole:]
+        if carry:
+            # Leftover characters mean the payload is truncated; let the decoder reject it
+            f.write(_b64decode(carry))
+    
+    def _download_to_file(self, url: str, output_path: str) -> bool:
+        """Stream a URL to disk in fixed-size chunks instead of buffering the whole body"""
+        if self.http2:
+            with self.session.stream('GET', url) as response:
+                if response.status_code != 200:
+                    self.logger.error("Failed to download enhanced image: %s", response.status_code)
+                    return False
+                with self._atomic_write(output_path) as f:
+                    for chunk in response.iter_bytes(chunk_size=_DOWNLOAD_CHUNK_SIZE):
+                        f.write(chunk)
+            return True
+        
+        with self.session.get(url, stream=True, timeout=300) as response:
+            if response.status_code != 200:
+                self.logger.error("Failed to download enhanced image: %s", response.status_code)
+                return False
+            with self._atomic_write(output_path) as f:
+                for chunk in response.iter_content(chunk_size=_DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
+        return True
+    
+    async def enhance_image_async(self, image_path: str, model: str = 'nightmareai/real-esrgan',
+                                  options: Optional[Dict] = None,
+                                  max_input_dim: Optional[int] = None) -> Dict:
+        """Run enhance_image in a worker thread without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.enhance_image,
+                                          image_path, model, options, max_input_dim)
+    
+    async def classify_image_async(self, image_path: str) -> Dict:
+        """Run classify_image in a worker thread without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.classify_image, image_path)
+    
+    async def save_enhanced_image_async(self, result: Dict, output_path: str) -> bool:
+        """Run save_enhanced_image in a worker thread without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.save_enhanced_image,
+                                          result, output_path)
 
 def main():
     """CLI interface for the SDK"""
@@ -259,6 +1069,10 @@ def main():
     parser.add_argument('--base-url', default='http://localhost:8000', 
                        help='Base URL of the enhancement API')
     parser.add_argument('--admin-key', help='Admin key for privileged operations')
+    parser.add_argument('--wire-format', choices=ImageEnhancerSDK.WIRE_FORMATS, default='json',
+                       help='Upload images as base64 JSON or raw multipart form data')
+    parser.add_argument('--http2', action='store_true',
+                       help='Use an HTTP/2 transport (requires httpx[http2])')
     
     subparsers = parser.add_subparsers(dest='command', help='Available commands')
     
@@ -269,6 +1083,8 @@ def main():
     enhance_parser.add_argument('--model', default='nightmareai/real-esrgan', 
                                help='AI model to use')
     enhance_parser.add_argument('--scale', type=int, default=4, help='Upscaling factor')
+    enhance_parser.add_argument('--max-dim', type=int,
+                               help='Downscale inputs larger than this many pixels before upload')
     
     # Batch enhance command
     batch_parser = subparsers.add_parser('batch', help='Enhance multiple images')
@@ -276,6 +1092,13 @@ def main():
     batch_parser.add_argument('output_dir', help='Output directory for enhanced images')
     batch_parser.add_argument('--model', default='nightmareai/real-esrgan', help='AI model to use')
     batch_parser.add_argument('--scale', type=int, default=4, help='Upscaling factor')
+    batch_parser.add_argument('--max-dim', type=int,
+                             help='Downscale inputs larger than this many pixels before upload')
+    batch_parser.add_argument('--chunk-size', type=int, default=0,
+                             help='Send this many images per request to the batch endpoint '
+                                  '(default: one request per image)')
+    batch_parser.add_argument('--rps', type=float, default=5.0,
+                             help='Maximum requests per second (0 for no limit)')
     
     # Classify command
     classify_parser = subparsers.add_parser('classify', help='Classify image quality')
@@ -301,17 +1124,21 @@ def main():
     
     args = parser.parse_args()
     
+    if getattr(args, 'rps', 0) < 0:
+        parser.error('--rps must be positive, or 0 for no limit')
+    
     if not args.command:
         parser.print_help()
         return
     
     # Initialize SDK
-    sdk = ImageEnhancerSDK(args.base_url, args.admin_key)
+    sdk = ImageEnhancerSDK(args.base_url, args.admin_key, wire_format=args.wire_format,
+                           http2=args.http2)
     
     # Execute command
     if args.command == 'enhance':
         options = {'scale': args.scale}
-        result = sdk.enhance_image(args.input, args.model, options)
+        result = sdk.enhance_image(args.input, args.model, options, max_input_dim=args.max_dim)
         
         if 'error' in result:
             print(f"Error: {result['error']}")
@@ -327,25 +1154,36 @@ def main():
         output_dir = Path(args.output_dir)
         output_dir.mkdir(exist_ok=True)
         
-        # Find all image files
-        image_extensions = {'.jpg', '.jpeg', '.png', '.webp', '.bmp'}
-        image_files = [f for f in input_dir.iterdir() 
-                      if f.suffix.lower() in image_extensions]
+        # Find all image files and their save destinations in one pass;
+        # DirEntry caches the file type, so no per-entry stat call
+        image_files = []
+        output_paths = []
+        with os.scandir(input_dir) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.name.lower().endswith(_IMAGE_EXTENSIONS):
+                    image_files.append(entry.path)
+                    output_paths.append(os.path.join(output_dir, f"enhanced_{entry.name}"))
         
         if not image_files:
             print(f"No image files found in {input_dir}")
             return
         
         options = {'scale': args.scale}
-        results = sdk.batch_enhance([str(f) for f in image_files], args.model, options)
+        if args.chunk_size > 0:
+            results = sdk.batch_enhance_batched(image_files, args.model, options,
+                                                chunk_size=args.chunk_size,
+                                                output_paths=output_paths, rps=args.rps or None,
+                                                max_input_dim=args.max_dim)
+        else:
+            results = sdk.batch_enhance(image_files, args.model, options,
+                                        max_input_dim=args.max_dim, output_paths=output_paths,
+                                        rps=args.rps or None)
         
         successful = 0
         for item in results:
             result = item['result']
             if 'error' not in result:
-                input_path = Path(item['image_path'])
-                output_path = output_dir / f"enhanced_{input_path.name}"
-                if sdk.save_enhanced_image(result, str(output_path)):
+                if sdk.save_enhanced_image(result, item['output_path']):
                     successful += 1
         
         print(f"Batch processing completed: {successful}/{len(results)} images enhanced")
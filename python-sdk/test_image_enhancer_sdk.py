@@ -0,0 +1,193 @@
+import http.server
+import json
+import os
+import tempfile
+import threading
+import unittest
+
+from image_enhancer_sdk import ImageEnhancerSDK, MultipartEncoder
+
+
+class _FlakyHandler(http.server.BaseHTTPRequestHandler):
+    """Answer the first POST with 503 and later ones with the size of the body received"""
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        self.server.bodies.append(body)
+
+        if len(self.server.bodies) == 1:
+            self.send_response(503)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        reply = json.dumps({'success': True, 'received': len(body)}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(reply)))
+        self.end_headers()
+        self.wfile.write(reply)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _ETagHandler(http.server.BaseHTTPRequestHandler):
+    """Tag every 200 with an ETag and answer a matching If-None-Match with server.match_status"""
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers['Content-Length']))
+        if_none_match = self.headers.get('If-None-Match')
+        self.server.conditions.append(if_none_match)
+
+        if if_none_match == '"v1"':
+            self.send_response(self.server.match_status)
+            self.send_header('ETag', '"v1"')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        reply = json.dumps({'status': 'ok', 'path': self.path}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('ETag', '"v1"')
+        self.send_header('Content-Length', str(len(reply)))
+        self.end_headers()
+        self.wfile.write(reply)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ConditionalRequestTest(unittest.TestCase):
+    def setUp(self):
+        self.server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), _ETagHandler)
+        self.server.conditions = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+        host, port = self.server.server_address
+        self.sdk = ImageEnhancerSDK(f"http://{host}:{port}")
+
+    def tearDown(self):
+        self.sdk.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def assert_served_from_cache(self, match_status):
+        self.server.match_status = match_status
+        results = [self.sdk.get_system_status() for _ in range(3)]
+
+        self.assertEqual(results, [{'status': 'ok', 'path': '/api/admin'}] * 3)
+        self.assertEqual(self.server.conditions, [None, '"v1"', '"v1"'])
+
+    def test_not_modified_returns_cached_body(self):
+        self.assert_served_from_cache(304)
+
+    def test_precondition_failed_on_post_returns_cached_body(self):
+        self.assert_served_from_cache(412)
+
+    def test_classify_uploads_once_per_poll(self):
+        self.server.match_status = 412
+        fd, image_path = tempfile.mkstemp(suffix='.png')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(os.urandom(1024))
+        self.addCleanup(os.unlink, image_path)
+
+        results = [self.sdk.classify_image(image_path) for _ in range(2)]
+
+        self.assertEqual(results, [{'status': 'ok', 'path': '/api/classify'}] * 2)
+        self.assertEqual(self.server.conditions, [None, '"v1"'])
+
+
+@unittest.skipIf(MultipartEncoder is None, "requests-toolbelt is not installed")
+class MultipartRetryTest(unittest.TestCase):
+    def setUp(self):
+        self.server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), _FlakyHandler)
+        self.server.bodies = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+        self.image_bytes = os.urandom(64 * 1024)
+        fd, self.image_path = tempfile.mkstemp(suffix='.png')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(self.image_bytes)
+
+        host, port = self.server.server_address
+        self.sdk = ImageEnhancerSDK(f"http://{host}:{port}", wire_format='multipart')
+
+    def tearDown(self):
+        self.sdk.close()
+        self.server.shutdown()
+        self.server.server_close()
+        os.unlink(self.image_path)
+
+    def test_streamed_upload_is_resent_after_gateway_error(self):
+        results = []
+        worker = threading.Thread(target=lambda: results.append(self.sdk.enhance_image(self.image_path)),
+                                  daemon=True)
+        worker.start()
+        worker.join(timeout=10)
+
+        self.assertFalse(worker.is_alive(), "upload hung on retry")
+        self.assertEqual(len(self.server.bodies), 2)
+        for body in self.server.bodies:
+            self.assertIn(self.image_bytes, body)
+        self.assertEqual(results, [{'success': True, 'received': len(self.server.bodies[1])}])
+
+
+class BatchRetryTest(unittest.TestCase):
+    def setUp(self):
+        self.server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), _FlakyHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        self.image_bytes = os.urandom(64 * 1024)
+        fd, self.image_path = tempfile.mkstemp(suffix='.png')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(self.image_bytes)
+        self.addCleanup(os.unlink, self.image_path)
+
+    def test_fan_out_retries_gateway_error(self):
+        host, port = self.server.server_address
+        for wire_format in ImageEnhancerSDK.WIRE_FORMATS:
+            with self.subTest(wire_format=wire_format):
+                self.server.bodies = []
+                with ImageEnhancerSDK(f"http://{host}:{port}", wire_format=wire_format) as sdk:
+                    results = sdk.batch_enhance([self.image_path], rps=None)
+
+                self.assertEqual(len(self.server.bodies), 2)
+                self.assertEqual(len(self.server.bodies[0]), len(self.server.bodies[1]))
+                self.assertEqual(results[0]['result'].get('success'), True)
+
+
+class SaveTest(unittest.TestCase):
+    def test_missing_output_directory_reports_original_error(self):
+        output_path = os.path.join(tempfile.gettempdir(), 'no-such-dir', 'out.png')
+        with ImageEnhancerSDK('http://127.0.0.1:9') as sdk:
+            with self.assertRaises(FileNotFoundError) as raised:
+                with sdk._atomic_write(output_path) as f:
+                    f.write(b'data')
+
+        self.assertIsNone(raised.exception.__context__)
+        self.assertFalse(os.path.exists(output_path))
+
+
+class BatchArgumentTest(unittest.TestCase):
+    def setUp(self):
+        self.sdk = ImageEnhancerSDK('http://127.0.0.1:9')
+        self.addCleanup(self.sdk.close)
+
+    def test_rejects_limits_that_admit_no_requests(self):
+        for method, kwargs in [
+            (self.sdk.batch_enhance, {'max_concurrent': 0}),
+            (self.sdk.batch_enhance_batched, {'max_concurrent': 0}),
+            (self.sdk.batch_enhance_batched, {'chunk_size': 0}),
+            (self.sdk.batch_enhance, {'rps': 0}),
+        ]:
+            with self.subTest(method=method.__name__, **kwargs):
+                with self.assertRaises(ValueError):
+                    method(['missing.png'], **kwargs)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,4 +1,5 @@
 import { NextRequest, NextResponse } from 'next/server';
+import { readImageRequestBody } from '@/lib/requestBody';
 
 interface ClassificationResult {
   overall_quality: 'excellent' | 'good' | 'fair' | 'poor';
@@ -16,7 +17,7 @@ interface ClassificationResult {
 
 export async function POST(request: NextRequest) {
   try {
-    const { image, originalImage, enhancementDetails } = await request.json();
+    const { image, originalImage, enhancementDetails } = await readImageRequestBody(request);
 
     if (!image) {
       return NextResponse.json(
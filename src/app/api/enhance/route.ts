@@ -1,4 +1,5 @@
 import { NextRequest, NextResponse } from 'next/server';
+import { readImageRequestBody } from '@/lib/requestBody';
 
 interface ReplicateResponse {
   id: string;
@@ -9,7 +10,7 @@ interface ReplicateResponse {
 
 export async function POST(request: NextRequest) {
   try {
-    const { image, model = 'nightmareai/real-esrgan', options = {}, useFallback = false } = await request.json();
+    const { image, model = 'nightmareai/real-esrgan', options = {}, useFallback = false } = await readImageRequestBody(request);
 
     if (!image) {
       return NextResponse.json(
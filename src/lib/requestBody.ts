@@ -0,0 +1,33 @@
+import { NextRequest } from 'next/server';
+
+/**
+ * Read an image API request body sent either as JSON or as multipart/form-data.
+ *
+ * Multipart uploads carry the raw file in the `image` field and JSON-encoded
+ * objects (e.g. `options`) as string fields. The file is converted to a data
+ * URI so route handlers see the same shape as the JSON wire format.
+ */
+export async function readImageRequestBody(request: NextRequest): Promise<Record<string, any>> {
+  const contentType = request.headers.get('content-type') || '';
+  if (!contentType.includes('multipart/form-data')) {
+    return request.json();
+  }
+
+  const form = await request.formData();
+  const body: Record<string, any> = {};
+
+  for (const [key, value] of form.entries()) {
+    if (typeof value !== 'string') {
+      const buffer = Buffer.from(await value.arrayBuffer());
+      body[key] = `data:${value.type || 'application/octet-stream'};base64,${buffer.toString('base64')}`;
+    } else if (key === 'options' || key === 'enhancementDetails') {
+      body[key] = JSON.parse(value);
+    } else if (key === 'useFallback') {
+      body[key] = value === 'true';
+    } else {
+      body[key] = value;
+    }
+  }
+
+  return body;
+}